@@ -0,0 +1,75 @@
+# _batcher.py
+# Cross-session micro-batching for STT calls.
+#
+# Each Streamlit session runs in its own thread, so N concurrent users
+# otherwise issue N fully independent transcription calls. A single
+# background event loop collects in-flight requests for a short window
+# (20ms) and dispatches each batch together: requests at least run
+# concurrently instead of serially per worker thread, and the local
+# faster-whisper pipeline amortizes its setup across users.
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+import audio_utils
+
+# How long to wait for more requests before dispatching a batch.
+_BATCH_WINDOW_S = 0.02
+
+_STT_QUEUE: asyncio.Queue = asyncio.Queue()
+
+_loop = asyncio.new_event_loop()
+
+
+def _drain(queue: asyncio.Queue, first) -> list:
+    """Collect everything queued during the batch window into one list."""
+    batch = [first]
+    try:
+        while True:
+            batch.append(queue.get_nowait())
+    except asyncio.QueueEmpty:
+        pass
+    return batch
+
+
+def _resolve(futures, results) -> None:
+    for fut, res in zip(futures, results):
+        if isinstance(res, Exception):
+            fut.set_exception(res)
+        else:
+            fut.set_result(res)
+
+
+async def _stt_worker() -> None:
+    while True:
+        first = await _STT_QUEUE.get()
+        await asyncio.sleep(_BATCH_WINDOW_S)
+        audios, futures = zip(*_drain(_STT_QUEUE, first))
+        results = await asyncio.gather(
+            *[asyncio.to_thread(audio_utils.speech_to_text, a) for a in audios],
+            return_exceptions=True,
+        )
+        _resolve(futures, results)
+
+
+def _run_loop() -> None:
+    asyncio.set_event_loop(_loop)
+    _loop.create_task(_stt_worker())
+    _loop.run_forever()
+
+
+threading.Thread(target=_run_loop, daemon=True, name="movi-batcher").start()
+
+
+# ---- Blocking wrappers (called from Streamlit worker threads) ----
+
+def transcribe(uploaded_audio) -> Optional[str]:
+    """Transcribe one recording through the shared micro-batch queue."""
+    fut: Future = Future()
+    _loop.call_soon_threadsafe(_STT_QUEUE.put_nowait, (uploaded_audio, fut))
+    return fut.result()
+
@@ -1,11 +1,31 @@
 import base64
+import hashlib
+import threading
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from typing import List, Dict, Any
 
+import pandas as pd
 import streamlit as st
+from PIL import Image
+
+try:
+    # SIMD-accelerated base64; optional, stdlib fallback below.
+    import pybase64
+except ImportError:
+    pybase64 = None
 
 import db
-from movi_agent import get_movi_graph
+from movi_agent import LLM, get_movi_graph
 import audio_utils
+import _batcher
+
+
+# Background workers for voice transcription and image preprocessing, so
+# I/O-bound ASR and CPU-bound encoding overlap instead of running serially.
+_WORK_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="movi-worker")
 
 
 st.set_page_config(
@@ -14,121 +34,366 @@ st.set_page_config(
 )
 
 
-def _init_once():
-    # Create DB/tables and seed dummy data
+def _warmup() -> None:
+    """
+    Fire tiny STT/TTS/LLM requests in the background so the first real
+    interaction doesn't pay TLS handshakes and server-side model warmup.
+    Every step is best-effort; failures here must never surface in the UI.
+    """
+    try:
+        # ~100ms of silence as a minimal valid WAV for the STT path.
+        buf = BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b"\x00\x00" * 1600)
+        buf.seek(0)
+        buf.name = "warmup.wav"
+        audio_utils.speech_to_text(buf)
+    except Exception:
+        pass
+    try:
+        audio_utils.text_to_speech(".")
+    except Exception:
+        pass
+    try:
+        get_movi_graph().invoke(
+            {"messages": [{"type": "human", "content": "ping"}], "current_page": "unknown"},
+            config={"configurable": {"thread_id": "warmup"}},
+        )
+    except Exception:
+        pass
+
+
+@st.cache_resource
+def _init_once() -> bool:
+    # Create DB/tables and seed dummy data (once per process, not per rerun)
     db.init_db()
+    threading.Thread(target=_warmup, daemon=True).start()
+    return True
 
 
-_init_once()
-graph = get_movi_graph()
+@st.cache_resource
+def _get_graph():
+    # Building the LangGraph (LLM client, tool schemas) is expensive;
+    # keep one instance across reruns and sessions.
+    return get_movi_graph()
 
 
 # ------------- Helpers -------------
+@st.cache_data(show_spinner=False)
+def _img_data_uri(file_id: str, _uploaded) -> str:
+    """
+    Downscale + re-encode an uploaded screenshot as a JPEG data URI.
+
+    A raw 4K PNG becomes a multi-MB base64 blob; the vision model gets no
+    benefit past ~1024px, so we thumbnail and recompress before encoding.
+    Cached on the uploader's stable file_id (the underscore keeps the
+    payload itself out of the cache key), so a given upload is read and
+    encoded exactly once; pybase64 uses SSE/AVX when available.
+    """
+    _uploaded.seek(0)
+    img = Image.open(_uploaded)
+    img.thumbnail((1024, 1024), Image.LANCZOS)
+    buf = BytesIO()
+    img.convert("RGB").save(buf, format="JPEG", quality=85, optimize=True)
+    jpeg_bytes = buf.getvalue()
+
+    if pybase64 is not None:
+        return "data:image/jpeg;base64," + pybase64.b64encode_as_string(jpeg_bytes)
+    # Zero-dep fallback: assemble the URI in bytes and decode once as
+    # ASCII, which skips the UTF-8 validation pass on the large buffer.
+    return (b"data:image/jpeg;base64," + base64.b64encode(jpeg_bytes)).decode("ascii")
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_bus_rows() -> pd.DataFrame:
+    """Dashboard rows as a DataFrame, cached across reruns for 30s."""
+    # db returns {column: [values]}, which pandas adopts as column arrays
+    # without the per-row dict unpacking from_records does.
+    return pd.DataFrame(db.fetch_bus_dashboard_data())
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_routes() -> pd.DataFrame:
+    """manageRoute rows as a DataFrame, cached across reruns for 30s."""
+    return pd.DataFrame(db.fetch_routes_data())
+
+
 def _render_bus_dashboard():
     st.subheader("busDashboard")
 
-    rows = db.fetch_bus_dashboard_data()
-    if not rows:
+    df = _cached_bus_rows()
+    if df.empty:
         st.info("No trips found in dummy data.")
         return
 
     left, right = st.columns([2, 3])
     with left:
         st.markdown("**Trips (left panel)**")
-        trip_view = [
-            {
-                "Trip": r["display_name"],
-                "Route": r["route_display_name"],
-                "Status": r["live_status"],
-                "Bookings %": r["booking_status_percentage"],
+        trip_view = df[
+            [
+                "display_name",
+                "route_display_name",
+                "live_status",
+                "booking_status_percentage",
+            ]
+        ].rename(
+            columns={
+                "display_name": "Trip",
+                "route_display_name": "Route",
+                "live_status": "Status",
+                "booking_status_percentage": "Bookings %",
             }
-            for r in rows
-        ]
+        )
         st.dataframe(trip_view, use_container_width=True)
 
     with right:
         st.markdown("**Deployments (vehicle + driver)**")
-        dep_view = [
-            {
-                "Trip": r["display_name"],
-                "Vehicle": r["license_plate"] or "—",
-                "Driver": r["driver_name"] or "—",
+        dep_view = df[["display_name", "license_plate", "driver_name"]].rename(
+            columns={
+                "display_name": "Trip",
+                "license_plate": "Vehicle",
+                "driver_name": "Driver",
             }
-            for r in rows
-        ]
+        )
+        dep_view[["Vehicle", "Driver"]] = dep_view[["Vehicle", "Driver"]].fillna("—")
         st.dataframe(dep_view, use_container_width=True)
 
 
 def _render_manage_route():
     st.subheader("manageRoute")
 
-    routes = db.fetch_routes_data()
-    if not routes:
+    routes = _cached_routes()
+    if routes.empty:
         st.info("No routes found in dummy data.")
         return
 
     st.markdown("**Routes (derived from Paths + Stops)**")
-    route_view = [
-        {
-            "Route": r["route_display_name"],
-            "Path": r["path_name"],
-            "Shift": r["shift_time"],
-            "Direction": r["direction"],
-            "From": r["start_point"],
-            "To": r["end_point"],
-            "Status": r["status"],
+    route_view = routes.rename(
+        columns={
+            "route_display_name": "Route",
+            "path_name": "Path",
+            "shift_time": "Shift",
+            "direction": "Direction",
+            "start_point": "From",
+            "end_point": "To",
+            "status": "Status",
         }
-        for r in routes
-    ]
+    )
     st.dataframe(route_view, use_container_width=True)
 
 
-def _history_to_graph_messages(
-    history: List[Dict[str, Any]],
-    last_image_b64: str | None = None,
+# Context window bounds: past _ROTATE_AT turns since the last rotation, the
+# thread is restarted from a summary + the last _KEEP turns, so prefill cost
+# stays bounded instead of growing linearly with the conversation.
+_HISTORY_KEEP = 8
+_HISTORY_ROTATE_AT = 24
+
+
+def _summarize_turns(roles: List[str], contents: List[str]) -> str:
+    """One-to-two sentence summary of old turns, via a plain LLM call."""
+    transcript = "\n".join(f"{r}: {c}" for r, c in zip(roles, contents))
+    resp = LLM.invoke(
+        "Summarize this transport-admin conversation in 1-2 sentences, "
+        "keeping any trip, route, vehicle or driver names mentioned:\n"
+        + transcript
+    )
+    return resp.content if isinstance(resp.content, str) else str(resp.content)
+
+
+def _trim_history(
+    roles: List[str],
+    contents: List[str],
+    k: int = _HISTORY_KEEP,
+    summary: str | None = None,
 ) -> list:
     """
-    Convert simple dict history into LangGraph-compatible chat messages.
+    Bounded replay window for seeding a fresh thread: a system summary of
+    the dropped turns (when available) plus the last k turns verbatim.
+    """
+    msgs = []
+    if summary:
+        msgs.append(
+            {
+                "type": "system",
+                "content": f"Summary of earlier conversation: {summary}",
+            }
+        )
+    for role, content in zip(roles[-k:], contents[-k:]):
+        msgs.append(
+            {"type": "human" if role == "user" else "ai", "content": content}
+        )
+    return msgs
 
-    For the last user message we optionally attach the uploaded screenshot
-    as a multimodal image_url content.
+
+def _user_graph_message(content: str, image_uri: str | None = None) -> Dict[str, Any]:
     """
-    messages = []
-    for i, msg in enumerate(history):
-        role = msg["role"]
-        content = msg["content"]
-        is_last = i == len(history) - 1
-
-        if role == "user":
-            if is_last and last_image_b64:
-                # multimodal: text + image
-                messages.append(
-                    {
-                        "type": "human",
-                        "content": [
-                            {"type": "text", "text": content},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{last_image_b64}"
-                                },
-                            },
-                        ],
-                    }
-                )
-            else:
-                messages.append({"type": "human", "content": content})
-        else:
-            messages.append({"type": "ai", "content": content})
-    return messages
+    Build the LangGraph message for a new user turn, optionally attaching
+    the uploaded screenshot as multimodal image_url content. Prior turns
+    live in the checkpointer, so one message is all we ever send.
+    """
+    if image_uri:
+        return {
+            "type": "human",
+            "content": [
+                {"type": "text", "text": content},
+                {"type": "image_url", "image_url": {"url": image_uri}},
+            ],
+        }
+    return {"type": "human", "content": content}
 
 
 # ------------- Main UI -------------
 
 
+@st.fragment
+def _chat_panel(graph, page, speak_out, audio_input, uploaded_img):
+    """
+    The Movi chat column as a fragment: sidebar toggles and page switches
+    no longer rerun (and re-render) the entire conversation history.
+
+    The thread id is read from session state rather than taken as an
+    argument: fragment reruns replay arguments captured at the last full
+    run, which would resurrect a pre-rotation thread id.
+    """
+    st.subheader("Movi – AI assistant")
+
+    # Show history
+    for role, content in zip(
+        st.session_state["roles"], st.session_state["contents"]
+    ):
+        with st.chat_message(role):
+            st.markdown(content)
+
+    # Kick off transcription as soon as a recording is finalized; by the
+    # time the user presses "Use voice input" most of the work is done.
+    if audio_input is not None:
+        audio_key = hashlib.blake2b(
+            audio_input.getvalue(), digest_size=16
+        ).hexdigest()
+        if st.session_state.get("stt_key") != audio_key:
+            st.session_state["stt_key"] = audio_key
+            st.session_state["stt_future"] = _WORK_POOL.submit(
+                _batcher.transcribe, audio_input
+            )
+
+    # Resize+encode the screenshot concurrently with any pending
+    # transcription so neither blocks the other at send time.
+    img_future = None
+    if uploaded_img is not None:
+        img_future = _WORK_POOL.submit(
+            _img_data_uri, uploaded_img.file_id, uploaded_img
+        )
+
+    voice_text = None
+    if audio_input is not None and st.sidebar.button("Use voice input"):
+        with st.spinner("Transcribing voice..."):
+            voice_text = st.session_state["stt_future"].result()
+            if voice_text:
+                st.sidebar.success(f"Recognized: {voice_text}")
+            else:
+                st.sidebar.error("Couldn't understand audio, please try again.")
+
+    user_input = st.chat_input("Ask Movi something")
+    if not user_input and voice_text:
+        user_input = voice_text
+
+    if user_input:
+        # Add user message to history
+        st.session_state["roles"].append("user")
+        st.session_state["contents"].append(user_input)
+        with st.chat_message("user"):
+            st.markdown(user_input)
+
+        # Prepare multimodal messages for the agent. We only feed the
+        # image with the *current* message; encoding was started above.
+        image_uri = img_future.result() if img_future is not None else None
+
+        # The checkpointer already holds prior turns for this thread,
+        # so only the new user message goes over the wire.
+        graph_messages = [_user_graph_message(user_input, image_uri)]
+
+        # Rotate to a fresh thread once the conversation has grown past the
+        # threshold, replaying only summary + last few turns.
+        turns_since_rotation = (
+            len(st.session_state["contents"]) - st.session_state.get("rotated_at", 0)
+        )
+        if turns_since_rotation > _HISTORY_ROTATE_AT:
+            summary = None
+            fut = st.session_state.pop("summary_future", None)
+            if fut is not None:
+                try:
+                    summary = fut.result(timeout=5)
+                except Exception:
+                    pass
+            st.session_state["thread_id"] = uuid.uuid4().hex
+            st.session_state["rotated_at"] = len(st.session_state["contents"])
+            # Exclude the user turn appended above; it's already in
+            # graph_messages.
+            graph_messages = (
+                _trim_history(
+                    st.session_state["roles"][:-1],
+                    st.session_state["contents"][:-1],
+                    summary=summary,
+                )
+                + graph_messages
+            )
+
+        graph_config = {
+            "configurable": {"thread_id": st.session_state["thread_id"]}
+        }
+
+        # Call Movi (LangGraph) and render tokens as they arrive, so
+        # perceived latency is time-to-first-token rather than the
+        # full generation.
+        def _token_stream():
+            # stream_mode="messages" yields (message_chunk, metadata)
+            # pairs; only surface agent tokens, not tool outputs.
+            for chunk, meta in graph.stream(
+                {"messages": graph_messages, "current_page": page},
+                config=graph_config,
+                stream_mode="messages",
+            ):
+                if meta.get("langgraph_node") == "agent" and isinstance(
+                    chunk.content, str
+                ):
+                    yield chunk.content
+
+        with st.chat_message("assistant"):
+            reply_text = st.write_stream(_token_stream())
+            if not isinstance(reply_text, str):
+                reply_text = str(reply_text)
+
+            if speak_out:
+                audio_bytes = audio_utils.text_to_speech(reply_text)
+                if audio_bytes:
+                    st.audio(audio_bytes, format="audio/mp3")
+
+        st.session_state["roles"].append("assistant")
+        st.session_state["contents"].append(reply_text)
+
+        # Close to the rotation point, start summarizing the turns that will
+        # be dropped (fire-and-forget; joined at rotation time).
+        turns = len(st.session_state["contents"])
+        if (
+            turns - st.session_state.get("rotated_at", 0) > _HISTORY_ROTATE_AT - 2
+            and "summary_future" not in st.session_state
+        ):
+            st.session_state["summary_future"] = _WORK_POOL.submit(
+                _summarize_turns,
+                st.session_state["roles"][:-_HISTORY_KEEP],
+                st.session_state["contents"][:-_HISTORY_KEEP],
+            )
+
+
 def main():
     st.title("Movi – Multimodal Transport Agent")
 
+    _init_once()
+    graph = _get_graph()
+
     page = st.sidebar.radio("Admin page", ["busDashboard", "manageRoute"])
     st.sidebar.markdown("---")
     speak_out = st.sidebar.checkbox("Speak Movi's responses", value=False)
@@ -141,9 +406,14 @@ def main():
         "Upload busDashboard screenshot", type=["png", "jpg", "jpeg"]
     )
 
-    # Simple chat history kept entirely on the Streamlit side
-    if "chat_history" not in st.session_state:
-        st.session_state["chat_history"] = []
+    # Chat history as parallel role/content arrays: appends stay O(1) and
+    # the render loop just zips, instead of rebuilding dicts per rerun.
+    if "roles" not in st.session_state:
+        st.session_state["roles"] = []
+        st.session_state["contents"] = []
+
+    # Conversation state lives in the graph's checkpointer, keyed per session.
+    st.session_state.setdefault("thread_id", uuid.uuid4().hex)
 
     # Layout: left = page data, right = Movi chat
     col_main, col_chat = st.columns([3, 2])
@@ -155,74 +425,7 @@ def main():
             _render_manage_route()
 
     with col_chat:
-        st.subheader("Movi – AI assistant")
-
-        # Show history
-        for msg in st.session_state["chat_history"]:
-            with st.chat_message(msg["role"]):
-                st.markdown(msg["content"])
-
-        voice_text = None
-        if audio_input is not None and st.sidebar.button("Use voice input"):
-            with st.spinner("Transcribing voice..."):
-                voice_text = audio_utils.speech_to_text(audio_input)
-                if voice_text:
-                    st.sidebar.success(f"Recognized: {voice_text}")
-                else:
-                    st.sidebar.error("Couldn't understand audio, please try again.")
-
-        user_input = st.chat_input("Ask Movi something")
-        if not user_input and voice_text:
-            user_input = voice_text
-
-        if user_input:
-            # Add user message to history
-            st.session_state["chat_history"].append(
-                {"role": "user", "content": user_input}
-            )
-            with st.chat_message("user"):
-                st.markdown(user_input)
-
-            # Prepare multimodal messages for the agent
-            image_b64 = None
-            if uploaded_img is not None:
-                # We only feed the image with the *current* message.
-                img_bytes = uploaded_img.read()
-                image_b64 = base64.b64encode(img_bytes).decode("utf-8")
-
-            graph_messages = _history_to_graph_messages(
-                st.session_state["chat_history"], last_image_b64=image_b64
-            )
-
-            # Call Movi (LangGraph)
-            with st.spinner("Movi is thinking..."):
-                result_state = graph.invoke(
-                    {
-                        "messages": graph_messages,
-                        "current_page": page,
-                    }
-                )
-
-            final_messages = result_state["messages"]
-            last_msg = final_messages[-1]
-            # last_msg is a proper LangChain message object
-            reply_text = (
-                last_msg.content
-                if isinstance(last_msg.content, str)
-                else str(last_msg.content)
-            )
-
-            st.session_state["chat_history"].append(
-                {"role": "assistant", "content": reply_text}
-            )
-
-            with st.chat_message("assistant"):
-                st.markdown(reply_text)
-
-                if speak_out:
-                    audio_bytes = audio_utils.text_to_speech(reply_text)
-                    if audio_bytes:
-                        st.audio(audio_bytes, format="audio/mp3")
+        _chat_panel(graph, page, speak_out, audio_input, uploaded_img)
 
 
 if __name__ == "__main__":
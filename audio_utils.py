@@ -3,34 +3,93 @@
 
 from __future__ import annotations
 
+import os
 from io import BytesIO
 from typing import Optional
 
+import httpx
 from openai import OpenAI
 
-client = OpenAI()
+try:
+    # Optional local STT backend (CTranslate2). 3-12x faster than the hosted
+    # endpoint for batched decode and removes the network round-trip.
+    from faster_whisper import WhisperModel, BatchedInferencePipeline
+except ImportError:
+    WhisperModel = None
+    BatchedInferencePipeline = None
+
+# Shared HTTP client: HTTP/2 multiplexing lets concurrent STT/TTS calls
+# share one connection, keepalives skip repeated TCP/TLS setup, and the
+# tight connect timeout makes dead-network failures fail fast.
+_http = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60),
+    timeout=httpx.Timeout(30.0, connect=2.0),
+)
+client = OpenAI(http_client=_http)
+
+# Hosted STT model: gpt-4o-mini-transcribe has noticeably lower per-word
+# latency than the older whisper-1 endpoint; override via env if needed.
+STT_MODEL = os.getenv("MOVI_STT_MODEL", "gpt-4o-mini-transcribe")
+
+# Lazily-built local whisper pipeline (same lazy-global pattern as the graph).
+# The failure flag memoizes a broken init (e.g. no CUDA device) so the model
+# load is attempted once per process, not on every transcription call.
+_LOCAL_STT = None
+_LOCAL_STT_FAILED = False
+
+
+def _get_local_stt():
+    """Return the batched faster-whisper pipeline, or None if unavailable."""
+    global _LOCAL_STT, _LOCAL_STT_FAILED
+    if (
+        _LOCAL_STT is None
+        and not _LOCAL_STT_FAILED
+        and BatchedInferencePipeline is not None
+    ):
+        try:
+            model = WhisperModel(
+                "large-v3-turbo", device="cuda", compute_type="int8_float16"
+            )
+            _LOCAL_STT = BatchedInferencePipeline(model)
+        except Exception as e:
+            _LOCAL_STT_FAILED = True
+            print("local whisper init failed, using hosted STT:", repr(e))
+    return _LOCAL_STT
 
 
 def speech_to_text(uploaded_audio) -> Optional[str]:
     """
     Take a Streamlit audio_input (UploadedFile) and return transcribed text.
     If anything fails we just return None and the UI falls back gracefully.
+
+    Prefers the local batched faster-whisper pipeline when installed,
+    falling back to OpenAI's hosted whisper-1.
     """
     try:
         if uploaded_audio is None:
             return None
 
-        # Streamlit UploadedFile -> bytes
-        raw_bytes = uploaded_audio.getvalue()
-        if not raw_bytes:
+        # Empty-recording guard without copying the payload.
+        uploaded_audio.seek(0, 2)
+        if uploaded_audio.tell() == 0:
             return None
+        uploaded_audio.seek(0)
 
-        audio_file = BytesIO(raw_bytes)
-        audio_file.name = "voice_input.wav"
+        pipeline = _get_local_stt()
+        if pipeline is not None:
+            segments, _info = pipeline.transcribe(
+                uploaded_audio, batch_size=16, vad_filter=True
+            )
+            text = "".join(seg.text for seg in segments).strip()
+            return text or None
 
+        # The (filename, fileobj, content_type) tuple lets the SDK stream
+        # straight from the upload buffer instead of copying it via
+        # getvalue() + BytesIO.
         resp = client.audio.transcriptions.create(
-            model="whisper-1",   #
-            file=audio_file,
+            model=STT_MODEL,
+            file=("voice_input.wav", uploaded_audio, "audio/wav"),
         )
         text = (resp.text or "").strip()
         return text or None
@@ -50,13 +109,18 @@ def text_to_speech(text: str) -> Optional[bytes]:
         return None
 
     try:
-        resp = client.audio.speech.create(
-            model="gpt-4o-mini-tts", 
+        # Stream chunks as they are generated instead of buffering the
+        # whole response server-side first.
+        buf = BytesIO()
+        with client.audio.speech.with_streaming_response.create(
+            model="gpt-4o-mini-tts",
             voice="alloy",
             input=text,
-        )
-        audio_bytes = resp.read()
-        return audio_bytes
+            response_format="mp3",
+        ) as resp:
+            for chunk in resp.iter_bytes(4096):
+                buf.write(chunk)
+        return buf.getvalue()
     except Exception as e:
         print("text_to_speech failed:", repr(e))
         return None
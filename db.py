@@ -1,139 +1,215 @@
 from __future__ import annotations
+import atexit
+import os
 import sqlite3
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from typing import Literal
 
-DB_PATH = Path(__file__).parent / "movi.db"
+# Overridable so tests / benchmarks can point at a scratch file or ":memory:"
+# without monkey-patching the module.
+DB_PATH = Path(os.environ.get("MOVI_DB", Path(__file__).parent / "movi.db"))
 
 
 # === Connection helpers =======================================================
 
+# Per-connection PRAGMAs (these don't persist in the DB file, so they must
+# be reapplied on every new connection).
+_CONN_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA cache_size=-65536;",
+    "PRAGMA busy_timeout=3000;",
+    "PRAGMA foreign_keys=ON;",
+)
+
+# WAL mode is persistent per DB file; only switch it once per process.
+_wal_enabled = False
+
+# One long-lived connection per thread: re-opening the file, re-running the
+# PRAGMAs and rebuilding the prepared-statement cache on every call is pure
+# overhead for short tool queries. Callers must NOT close what they get back.
+_tls = threading.local()
+_all_connections: List[sqlite3.Connection] = []
+
+
 def get_connection() -> sqlite3.Connection:
-    """Return a sqlite connection with Row factory for dict-like access."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """Return this thread's long-lived connection, opening it on first use."""
+    global _wal_enabled
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            DB_PATH,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        if not _wal_enabled and str(DB_PATH) != ":memory:":
+            # One fsync per WAL checkpoint instead of per commit, and readers
+            # no longer block while a write is in flight. In-memory databases
+            # have no WAL file, so skip the (failing) mode switch there.
+            conn.execute("PRAGMA journal_mode=WAL;")
+            _wal_enabled = True
+        for pragma in _CONN_PRAGMAS:
+            conn.execute(pragma)
+        _tls.conn = conn
+        _all_connections.append(conn)
     return conn
 
 
-# === Bootstrap ============================================
-
-def init_db() -> None:
-    """
-    Create tables if missing.
+def get_ro_connection() -> sqlite3.Connection:
     """
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("PRAGMA foreign_keys = ON;")
-
-    # ----- Layer 1: Static assets -----
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS stops (
-            stop_id     INTEGER PRIMARY KEY AUTOINCREMENT,
-            name        TEXT UNIQUE NOT NULL,
-            latitude    REAL,
-            longitude   REAL
-        );
-        """
-    )
+    Return this thread's long-lived read-only connection.
 
-    # Use path_name (explicit as per spec)
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS paths (
-            path_id     INTEGER PRIMARY KEY AUTOINCREMENT,
-            path_name   TEXT UNIQUE NOT NULL
-        );
-        """
-    )
+    mode=ro makes SQLite reject writes at the engine level and skips all
+    lock-state bookkeeping a writable connection has to maintain, so the
+    hot dashboard reads use this one. Falls back to the writable connection
+    for in-memory databases (a second connection would see an empty DB).
+    """
+    if str(DB_PATH) == ":memory:":
+        return get_connection()
+    conn = getattr(_tls, "ro_conn", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            f"file:{DB_PATH}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONN_PRAGMAS:
+            conn.execute(pragma)
+        _tls.ro_conn = conn
+        _all_connections.append(conn)
+    return conn
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS path_stops (
-            id          INTEGER PRIMARY KEY AUTOINCREMENT,
-            path_id     INTEGER NOT NULL,
-            stop_id     INTEGER NOT NULL,
-            seq         INTEGER NOT NULL,
-            FOREIGN KEY (path_id) REFERENCES paths(path_id) ON DELETE CASCADE,
-            FOREIGN KEY (stop_id) REFERENCES stops(stop_id) ON DELETE CASCADE
-        );
-        """
-    )
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS routes (
-            route_id            INTEGER PRIMARY KEY AUTOINCREMENT,
-            path_id             INTEGER NOT NULL,
-            route_display_name  TEXT UNIQUE NOT NULL,
-            shift_time          TEXT NOT NULL,         -- "HH:MM"
-            direction           TEXT NOT NULL,         -- 'IN' | 'OUT'
-            start_point         TEXT NOT NULL,
-            end_point           TEXT NOT NULL,
-            status              TEXT NOT NULL CHECK (status IN ('active','deactivated')),
-            FOREIGN KEY (path_id) REFERENCES paths(path_id) ON DELETE CASCADE
-        );
-        """
-    )
+@atexit.register
+def _close_connections() -> None:
+    for conn in _all_connections:
+        try:
+            # Let SQLite refresh its planner stats before shutting down
+            # (no-op failure on read-only connections).
+            conn.execute("PRAGMA optimize;")
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
 
-    # ----- Layer 2: Dynamic operations -----
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS vehicles (
-            vehicle_id      INTEGER PRIMARY KEY AUTOINCREMENT,
-            license_plate   TEXT UNIQUE NOT NULL,
-            type            TEXT NOT NULL,            -- 'Bus' | 'Cab'
-            capacity        INTEGER NOT NULL
-        );
-        """
-    )
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS drivers (
-            driver_id       INTEGER PRIMARY KEY AUTOINCREMENT,
-            name            TEXT UNIQUE NOT NULL,
-            phone_number    TEXT
-        );
-        """
-    )
+# === Bootstrap ============================================
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS daily_trips (
-            trip_id                     INTEGER PRIMARY KEY AUTOINCREMENT,
-            route_id                    INTEGER NOT NULL,
-            display_name                TEXT UNIQUE NOT NULL,
-            booking_status_percentage   REAL DEFAULT 0,
-            live_status                 TEXT,          -- e.g. '00:01 IN'
-            FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE
-        );
-        """
-    )
+# Full DDL as one script so init_db issues a single executescript() call
+# (one parse pass, one implicit transaction) instead of a dozen round-trips.
+#
+# The UNIQUE columns already carry implicit indexes; the explicit ones cover
+# the NOT-EXISTS anti-joins and FK lookups that would otherwise full-scan.
+_SCHEMA_SQL = """
+    -- ----- Layer 1: Static assets -----
+    CREATE TABLE IF NOT EXISTS stops (
+        stop_id     INTEGER PRIMARY KEY AUTOINCREMENT,
+        name        TEXT UNIQUE NOT NULL,
+        latitude    REAL,
+        longitude   REAL
+    );
+
+    -- Use path_name (explicit as per spec)
+    CREATE TABLE IF NOT EXISTS paths (
+        path_id     INTEGER PRIMARY KEY AUTOINCREMENT,
+        path_name   TEXT UNIQUE NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS path_stops (
+        id          INTEGER PRIMARY KEY AUTOINCREMENT,
+        path_id     INTEGER NOT NULL,
+        stop_id     INTEGER NOT NULL,
+        seq         INTEGER NOT NULL,
+        FOREIGN KEY (path_id) REFERENCES paths(path_id) ON DELETE CASCADE,
+        FOREIGN KEY (stop_id) REFERENCES stops(stop_id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS routes (
+        route_id            INTEGER PRIMARY KEY AUTOINCREMENT,
+        path_id             INTEGER NOT NULL,
+        route_display_name  TEXT UNIQUE NOT NULL,
+        shift_time          TEXT NOT NULL,         -- "HH:MM"
+        direction           TEXT NOT NULL,         -- 'IN' | 'OUT'
+        start_point         TEXT NOT NULL,
+        end_point           TEXT NOT NULL,
+        status              TEXT NOT NULL CHECK (status IN ('active','deactivated')),
+        FOREIGN KEY (path_id) REFERENCES paths(path_id) ON DELETE CASCADE
+    );
+
+    -- ----- Layer 2: Dynamic operations -----
+    CREATE TABLE IF NOT EXISTS vehicles (
+        vehicle_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+        license_plate   TEXT UNIQUE NOT NULL,
+        type            TEXT NOT NULL,            -- 'Bus' | 'Cab'
+        capacity        INTEGER NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS drivers (
+        driver_id       INTEGER PRIMARY KEY AUTOINCREMENT,
+        name            TEXT UNIQUE NOT NULL,
+        phone_number    TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS daily_trips (
+        trip_id                     INTEGER PRIMARY KEY AUTOINCREMENT,
+        route_id                    INTEGER NOT NULL,
+        display_name                TEXT UNIQUE NOT NULL,
+        booking_status_percentage   REAL DEFAULT 0,
+        live_status                 TEXT,          -- e.g. '00:01 IN'
+        FOREIGN KEY (route_id) REFERENCES routes(route_id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS deployments (
+        deployment_id   INTEGER PRIMARY KEY AUTOINCREMENT,
+        trip_id         INTEGER UNIQUE NOT NULL,  -- one deployment per trip
+        vehicle_id      INTEGER,
+        driver_id       INTEGER,
+        FOREIGN KEY (trip_id) REFERENCES daily_trips(trip_id) ON DELETE CASCADE,
+        FOREIGN KEY (vehicle_id) REFERENCES vehicles(vehicle_id) ON DELETE SET NULL,
+        FOREIGN KEY (driver_id) REFERENCES drivers(driver_id) ON DELETE SET NULL
+    );
+
+    -- ----- Indexes -----
+    CREATE INDEX IF NOT EXISTS idx_deployments_vehicle ON deployments(vehicle_id);
+    CREATE INDEX IF NOT EXISTS idx_deployments_driver ON deployments(driver_id);
+    CREATE INDEX IF NOT EXISTS idx_path_stops_path_seq ON path_stops(path_id, seq);
+    CREATE INDEX IF NOT EXISTS idx_routes_path ON routes(path_id);
+    CREATE INDEX IF NOT EXISTS idx_routes_status ON routes(status);
+"""
 
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS deployments (
-            deployment_id   INTEGER PRIMARY KEY AUTOINCREMENT,
-            trip_id         INTEGER UNIQUE NOT NULL,  -- one deployment per trip
-            vehicle_id      INTEGER,
-            driver_id       INTEGER,
-            FOREIGN KEY (trip_id) REFERENCES daily_trips(trip_id) ON DELETE CASCADE,
-            FOREIGN KEY (vehicle_id) REFERENCES vehicles(vehicle_id) ON DELETE SET NULL,
-            FOREIGN KEY (driver_id) REFERENCES drivers(driver_id) ON DELETE SET NULL
-        );
-        """
-    )
 
-    conn.commit()
+def init_db() -> None:
+    """
+    Create tables if missing.
+    """
+    conn = get_connection()
+    conn.cursor().executescript(_SCHEMA_SQL)
     #_migrate_schema(conn)     # rename paths.name -> paths.path_name if needed
     _seed_if_empty(conn)      # populate once
-    conn.close()
 
 
 # === Seeding ==================================================================
 
+def _id_map(conn: sqlite3.Connection, sql: str) -> Dict[str, int]:
+    """
+    Build a {key: id} map from a 2-column query using plain tuple rows,
+    skipping sqlite3.Row construction and per-column name lookups.
+    """
+    cur = conn.cursor()
+    cur.row_factory = lambda _c, row: row
+    cur.execute(sql)
+    return dict(cur.fetchall())
+
+
 def _seed_if_empty(conn: sqlite3.Connection) -> None:
     """Seed realistic demo data to match screenshots / examples."""
     cur = conn.cursor()
@@ -141,272 +217,350 @@ def _seed_if_empty(conn: sqlite3.Connection) -> None:
     if cur.fetchone()["c"] > 0:
         return  # already seeded
 
-    # ----- Stops -----
-    stops = [
-        ("Gavipuram", 12.942, 77.566),
-        ("Temple", 12.945, 77.568),
-        ("Peenya", 13.020, 77.515),
-        ("Majestic", 12.978, 77.572),
-        ("Tech Park", 12.997, 77.700),
-    ]
-    cur.executemany(
-        "INSERT INTO stops (name, latitude, longitude) VALUES (?, ?, ?);", stops
-    )
-
-    # ----- Paths -----
-    for p in ("Path-1", "Path-2"):
-        cur.execute("INSERT INTO paths (path_name) VALUES (?);", (p,))
-
-    # id maps
-    cur.execute("SELECT stop_id, name FROM stops;")
-    stop_id_by_name = {r["name"]: r["stop_id"] for r in cur.fetchall()}
-
-    cur.execute("SELECT path_id, path_name FROM paths;")
-    path_id_by_name = {r["path_name"]: r["path_id"] for r in cur.fetchall()}
-
-    # Path-1: Gavipuram → Temple → Peenya
-    path1_id = path_id_by_name["Path-1"]
-    for seq, name in enumerate(["Gavipuram", "Temple", "Peenya"], start=1):
-        cur.execute(
+    # One transaction for the whole seed: SQLite's dominant insert cost is
+    # the commit fsync, so all rows share a single one. Deferring FK
+    # enforcement moves the per-insert constraint probes to one batch
+    # check at commit (the pragma auto-resets when the transaction ends).
+    cur.execute("BEGIN IMMEDIATE;")
+    try:
+        cur.execute("PRAGMA defer_foreign_keys=ON;")
+
+        # ----- Stops -----
+        stops = [
+            ("Gavipuram", 12.942, 77.566),
+            ("Temple", 12.945, 77.568),
+            ("Peenya", 13.020, 77.515),
+            ("Majestic", 12.978, 77.572),
+            ("Tech Park", 12.997, 77.700),
+        ]
+        # RETURNING fuses insert + id-fetch, so no re-select is needed to build
+        # the name->id maps (executemany can't carry RETURNING, hence the loops).
+        stop_id_by_name = {}
+        for s in stops:
+            row = cur.execute(
+                "INSERT INTO stops (name, latitude, longitude) VALUES (?, ?, ?) "
+                "RETURNING stop_id, name;",
+                s,
+            ).fetchone()
+            stop_id_by_name[row["name"]] = row["stop_id"]
+
+        # ----- Paths -----
+        path_id_by_name = {}
+        for p in ("Path-1", "Path-2"):
+            row = cur.execute(
+                "INSERT INTO paths (path_name) VALUES (?) RETURNING path_id, path_name;",
+                (p,),
+            ).fetchone()
+            path_id_by_name[row["path_name"]] = row["path_id"]
+
+        # Path-1: Gavipuram → Temple → Peenya
+        # Path-2: Peenya → Majestic → Tech Park
+        path_stop_rows = []
+        for path_name, stop_names in [
+            ("Path-1", ["Gavipuram", "Temple", "Peenya"]),
+            ("Path-2", ["Peenya", "Majestic", "Tech Park"]),
+        ]:
+            pid = path_id_by_name[path_name]
+            for seq, name in enumerate(stop_names, start=1):
+                path_stop_rows.append((pid, stop_id_by_name[name], seq))
+        cur.executemany(
             "INSERT INTO path_stops (path_id, stop_id, seq) VALUES (?, ?, ?);",
-            (path1_id, stop_id_by_name[name], seq),
+            path_stop_rows,
         )
 
-    # Path-2: Peenya → Majestic → Tech Park
-    path2_id = path_id_by_name["Path-2"]
-    for seq, name in enumerate(["Peenya", "Majestic", "Tech Park"], start=1):
+        # ----- Routes (derived start/end from path stops) -----
+        # One grouped query resolves first/last stop for every path at once
+        # instead of re-running the ordered join per route. MIN/MAX over seq
+        # is joined back to the stop rows; GROUP_CONCAT order is undefined,
+        # so it cannot be trusted to keep the sequence.
         cur.execute(
-            "INSERT INTO path_stops (path_id, stop_id, seq) VALUES (?, ?, ?);",
-            (path2_id, stop_id_by_name[name], seq),
+            """
+            SELECT b.path_id,
+                   s1.name AS start_name,
+                   s2.name AS end_name
+            FROM (
+                SELECT path_id, MIN(seq) AS min_seq, MAX(seq) AS max_seq
+                FROM path_stops
+                GROUP BY path_id
+            ) b
+            JOIN path_stops p1 ON p1.path_id = b.path_id AND p1.seq = b.min_seq
+            JOIN path_stops p2 ON p2.path_id = b.path_id AND p2.seq = b.max_seq
+            JOIN stops s1 ON s1.stop_id = p1.stop_id
+            JOIN stops s2 ON s2.stop_id = p2.stop_id;
+            """
         )
-
-    # ----- Routes (derived start/end from path stops) -----
-    def _start_end_for_path(pid: int) -> tuple[str, str]:
-        cur.execute(
+        start_end_by_path = {
+            r["path_id"]: (r["start_name"], r["end_name"]) for r in cur.fetchall()
+        }
+
+        routes_to_insert = []
+        for path_name, shift, direction, status in [
+            ("Path-1", "08:30", "IN", "active"),
+            ("Path-1", "19:45", "OUT", "active"),
+            ("Path-2", "19:45", "IN", "active"),
+        ]:
+            pid = path_id_by_name[path_name]
+            start, end = start_end_by_path[pid]
+            display_name = f"{path_name} - {shift}"
+            routes_to_insert.append((pid, display_name, shift, direction, start, end, status))
+
+        cur.executemany(
             """
-            SELECT s.name
-            FROM path_stops ps
-            JOIN stops s ON s.stop_id = ps.stop_id
-            WHERE ps.path_id = ?
-            ORDER BY ps.seq ASC;
+            INSERT INTO routes (
+                path_id, route_display_name, shift_time, direction,
+                start_point, end_point, status
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?);
             """,
-            (pid,),
+            routes_to_insert,
         )
-        names = [r["name"] for r in cur.fetchall()]
-        return names[0], names[-1]
-
-    routes_to_insert = []
-    for path_name, shift, direction, status in [
-        ("Path-1", "08:30", "IN", "active"),
-        ("Path-1", "19:45", "OUT", "active"),
-        ("Path-2", "19:45", "IN", "active"),
-    ]:
-        pid = path_id_by_name[path_name]
-        start, end = _start_end_for_path(pid)
-        display_name = f"{path_name} - {shift}"
-        routes_to_insert.append((pid, display_name, shift, direction, start, end, status))
-
-    cur.executemany(
-        """
-        INSERT INTO routes (
-            path_id, route_display_name, shift_time, direction,
-            start_point, end_point, status
+
+        # ----- Vehicles -----
+        vehicles = [
+            ("KA-01-1111", "Bus", 40),
+            ("MH-12-3456", "Bus", 40),
+            ("KA-05-9999", "Cab", 4),
+        ]
+        cur.executemany(
+            "INSERT INTO vehicles (license_plate, type, capacity) VALUES (?, ?, ?);",
+            vehicles,
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?);
-        """,
-        routes_to_insert,
-    )
 
-    # ----- Vehicles -----
-    vehicles = [
-        ("KA-01-1111", "Bus", 40),
-        ("MH-12-3456", "Bus", 40),
-        ("KA-05-9999", "Cab", 4),
-    ]
-    cur.executemany(
-        "INSERT INTO vehicles (license_plate, type, capacity) VALUES (?, ?, ?);",
-        vehicles,
-    )
+        # ----- Drivers -----
+        drivers = [
+            ("Amit", "9999990001"),
+            ("Rahul", "9999990002"),
+            ("Sneha", "9999990003"),
+        ]
+        cur.executemany(
+            "INSERT INTO drivers (name, phone_number) VALUES (?, ?);", drivers
+        )
 
-    # ----- Drivers -----
-    drivers = [
-        ("Amit", "9999990001"),
-        ("Rahul", "9999990002"),
-        ("Sneha", "9999990003"),
-    ]
-    cur.executemany(
-        "INSERT INTO drivers (name, phone_number) VALUES (?, ?);", drivers
-    )
+        # Route map
+        route_by_display = _id_map(conn, "SELECT route_display_name, route_id FROM routes;")
+
+        # ----- Daily trips (left panel items like 'Bulk - 00:01') -----
+        trips = [
+            # display_name            route_display_name  booking% live_status
+            ("Bulk - 00:01",          "Path-1 - 08:30",  25.0,    "00:01 IN"),
+            ("Bulk - 00:02",          "Path-1 - 08:30",   0.0,    "00:02 IN"),
+            ("Path Path - 00:02",     "Path-2 - 19:45",  10.0,    "00:02 OUT"),
+        ]
+        trip_rows = []
+        for disp, route_disp, pct, live in trips:
+            trip_rows.append((route_by_display[route_disp], disp, pct, live))
+
+        cur.executemany(
+            """
+            INSERT INTO daily_trips (route_id, display_name, booking_status_percentage, live_status)
+            VALUES (?, ?, ?, ?);
+            """,
+            trip_rows,
+        )
 
-    # Route map
-    cur.execute("SELECT route_id, route_display_name FROM routes;")
-    route_by_display = {r["route_display_name"]: r["route_id"] for r in cur.fetchall()}
-
-    # ----- Daily trips (left panel items like 'Bulk - 00:01') -----
-    trips = [
-        # display_name            route_display_name  booking% live_status
-        ("Bulk - 00:01",          "Path-1 - 08:30",  25.0,    "00:01 IN"),
-        ("Bulk - 00:02",          "Path-1 - 08:30",   0.0,    "00:02 IN"),
-        ("Path Path - 00:02",     "Path-2 - 19:45",  10.0,    "00:02 OUT"),
-    ]
-    trip_rows = []
-    for disp, route_disp, pct, live in trips:
-        trip_rows.append((route_by_display[route_disp], disp, pct, live))
-
-    cur.executemany(
-        """
-        INSERT INTO daily_trips (route_id, display_name, booking_status_percentage, live_status)
-        VALUES (?, ?, ?, ?);
-        """,
-        trip_rows,
-    )
+        # Maps for deployments
+        trip_id_by_name = _id_map(conn, "SELECT display_name, trip_id FROM daily_trips;")
+        vehicle_id_by_plate = _id_map(conn, "SELECT license_plate, vehicle_id FROM vehicles;")
+        driver_id_by_name = _id_map(conn, "SELECT name, driver_id FROM drivers;")
+
+        # ----- Deployments (vehicle+driver assigned to a trip) -----
+        deployments = [
+            ("Bulk - 00:01",      "KA-01-1111", "Amit"),
+            ("Path Path - 00:02", "MH-12-3456", "Rahul"),
+            # 'Bulk - 00:02' intentionally left unassigned
+        ]
+        dep_values = []
+        for trip_name, plate, driver_name in deployments:
+            dep_values.append(
+                (trip_id_by_name[trip_name], vehicle_id_by_plate[plate], driver_id_by_name[driver_name])
+            )
 
-    # Map for deployments
-    cur.execute("SELECT trip_id, display_name FROM daily_trips;")
-    trip_id_by_name = {r["display_name"]: r["trip_id"] for r in cur.fetchall()}
-
-    cur.execute("SELECT vehicle_id, license_plate FROM vehicles;")
-    vehicle_id_by_plate = {r["license_plate"]: r["vehicle_id"] for r in cur.fetchall()}
-
-    cur.execute("SELECT driver_id, name FROM drivers;")
-    driver_id_by_name = {r["name"]: r["driver_id"] for r in cur.fetchall()}
-
-    # ----- Deployments (vehicle+driver assigned to a trip) -----
-    deployments = [
-        ("Bulk - 00:01",      "KA-01-1111", "Amit"),
-        ("Path Path - 00:02", "MH-12-3456", "Rahul"),
-        # 'Bulk - 00:02' intentionally left unassigned
-    ]
-    dep_values = []
-    for trip_name, plate, driver_name in deployments:
-        dep_values.append(
-            (trip_id_by_name[trip_name], vehicle_id_by_plate[plate], driver_id_by_name[driver_name])
+        cur.executemany(
+            "INSERT INTO deployments (trip_id, vehicle_id, driver_id) VALUES (?, ?, ?);",
+            dep_values,
         )
 
-    cur.executemany(
-        "INSERT INTO deployments (trip_id, vehicle_id, driver_id) VALUES (?, ?, ?);",
-        dep_values,
-    )
-
-    conn.commit()
+        conn.commit()
+    except Exception:
+        # Roll back so the shared connection is not left mid-transaction
+        # with a partially seeded database.
+        conn.rollback()
+        raise
+
+
+
+# === SQL text =================================================================
+# Hoisted to module level so every call reuses the exact same string and the
+# per-connection prepared-statement cache skips re-parsing the query.
+
+_SQL_DASHBOARD_SELECT = """
+    SELECT
+        t.display_name,
+        t.booking_status_percentage,
+        t.live_status,
+        r.route_display_name,
+        v.license_plate,
+        d.name AS driver_name
+    FROM daily_trips t
+    JOIN routes r ON r.route_id = t.route_id
+    LEFT JOIN deployments dep ON dep.trip_id = t.trip_id
+    LEFT JOIN vehicles v ON v.vehicle_id = dep.vehicle_id
+    LEFT JOIN drivers d ON d.driver_id = dep.driver_id
+"""
+
+_SQL_DASHBOARD = _SQL_DASHBOARD_SELECT + "ORDER BY t.display_name LIMIT ? OFFSET ?;"
+
+_SQL_TRIP_STATUS = _SQL_DASHBOARD_SELECT + "WHERE t.display_name = ?;"
+
+_SQL_ROUTES_VIEW = """
+    SELECT
+        r.route_display_name,
+        p.path_name AS path_name,
+        r.shift_time,
+        r.direction,
+        r.start_point,
+        r.end_point,
+        r.status
+    FROM routes r
+    JOIN paths p ON p.path_id = r.path_id
+    ORDER BY p.path_name, r.shift_time
+    LIMIT ? OFFSET ?;
+"""
+
+_SQL_UNASSIGNED_VEHICLE_COUNT = """
+    SELECT COUNT(*) AS c
+    FROM vehicles v
+    WHERE NOT EXISTS (SELECT 1 FROM deployments d WHERE d.vehicle_id = v.vehicle_id);
+"""
+
+_SQL_UNASSIGNED_DRIVER_NAMES = """
+    SELECT d.name
+    FROM drivers d
+    WHERE NOT EXISTS (SELECT 1 FROM deployments dep WHERE dep.driver_id = d.driver_id)
+    ORDER BY d.name;
+"""
+
+_SQL_PATH_STOP_NAMES = """
+    SELECT s.name
+    FROM path_stops ps
+    JOIN stops s ON s.stop_id = ps.stop_id
+    WHERE ps.path_id = ?
+    ORDER BY ps.seq ASC;
+"""
+
+_SQL_ROUTES_FOR_PATH = """
+    SELECT route_display_name, shift_time, direction, status
+    FROM routes
+    WHERE path_id = ?
+    ORDER BY shift_time;
+"""
+
+_SQL_ACTIVE_ROUTES = """
+    SELECT route_display_name, shift_time, direction
+    FROM routes
+    WHERE status = 'active'
+    ORDER BY shift_time;
+"""
+
+
+# === Read-result cache ========================================================
+# The dashboard join and trip-status lookup run on every UI action, but the
+# data only changes through the write functions in this module. Cache the
+# results and bump the version token whenever a write happens.
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Any] = {"version": 0, "dashboard": {}, "trip_status": {}}
+
+
+def _invalidate_cache() -> None:
+    """Drop cached read results after any write."""
+    with _cache_lock:
+        _cache["version"] += 1
+        _cache["dashboard"].clear()
+        _cache["trip_status"].clear()
 
 
 # === Simple UI queries (used by Streamlit pages) ==============================
 
-def fetch_bus_dashboard_data() -> List[Dict[str, Any]]:
-    """Return rows for busDashboard (trips + current deployment info)."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT
-            t.display_name,
-            t.booking_status_percentage,
-            t.live_status,
-            r.route_display_name,
-            v.license_plate,
-            d.name AS driver_name
-        FROM daily_trips t
-        JOIN routes r ON r.route_id = t.route_id
-        LEFT JOIN deployments dep ON dep.trip_id = t.trip_id
-        LEFT JOIN vehicles v ON v.vehicle_id = dep.vehicle_id
-        LEFT JOIN drivers d ON d.driver_id = dep.driver_id
-        ORDER BY t.display_name;
-        """
-    )
-    rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
-    return rows
+def _columnar(cur) -> Dict[str, List[Any]]:
+    """
+    Fetch the remaining rows as {column: [values]} (struct-of-arrays).
+
+    One dict per result set instead of one per row; pandas consumes this
+    directly as column arrays with no per-row dict unpacking.
+    """
+    cur.row_factory = lambda _c, row: row
+    cols = [c[0] for c in cur.description]
+    data = cur.fetchall()
+    if not data:
+        return {c: [] for c in cols}
+    return dict(zip(cols, map(list, zip(*data))))
 
 
-def fetch_routes_data() -> List[Dict[str, Any]]:
-    """Return rows for manageRoute (routes derived from paths + ordered stops)."""
-    conn = get_connection()
+def fetch_bus_dashboard_data(limit: int = 50, offset: int = 0) -> Dict[str, List[Any]]:
+    """
+    Return busDashboard columns (trips + current deployment info) as
+    {column: [values]}.
+
+    LIMIT/OFFSET keep the join bounded as the trips table grows; the UI
+    only ever renders one page of rows at a time.
+    """
+    page = (limit, offset)
+    with _cache_lock:
+        cached = _cache["dashboard"].get(page)
+        if cached is not None:
+            return cached
+        version = _cache["version"]
+    conn = get_ro_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT
-            r.route_display_name,
-            p.path_name AS path_name,
-            r.shift_time,
-            r.direction,
-            r.start_point,
-            r.end_point,
-            r.status
-        FROM routes r
-        JOIN paths p ON p.path_id = r.path_id
-        ORDER BY p.path_name, r.shift_time;
-        """
-    )
-    rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
-    return rows
+    cur.execute(_SQL_DASHBOARD, page)
+    result = _columnar(cur)
+    with _cache_lock:
+        # Only store if no write invalidated the cache while the query
+        # ran; a stale result stored late would be served until the
+        # next write.
+        if _cache["version"] == version:
+            _cache["dashboard"][page] = result
+    return result
+
+
+def fetch_routes_data(limit: int = 50, offset: int = 0) -> Dict[str, List[Any]]:
+    """Return manageRoute columns (routes from paths + ordered stops) as {column: [values]}."""
+    conn = get_ro_connection()
+    cur = conn.cursor()
+    cur.execute(_SQL_ROUTES_VIEW, (limit, offset))
+    return _columnar(cur)
 
 
 # === Tool-facing functions (used by Movi's actions) ===========================
 
 def count_unassigned_vehicles() -> str:
-    conn = get_connection()
+    conn = get_ro_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT COUNT(*) AS c
-        FROM vehicles v
-        WHERE NOT EXISTS (SELECT 1 FROM deployments d WHERE d.vehicle_id = v.vehicle_id);
-        """
-    )
+    cur.execute(_SQL_UNASSIGNED_VEHICLE_COUNT)
     c = cur.fetchone()["c"]
-    conn.close()
     return f"There are {c} vehicles not assigned to any trip right now."
 
 
 def list_unassigned_drivers() -> str:
-    conn = get_connection()
+    conn = get_ro_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT COUNT(*) AS c
-        FROM drivers d
-        WHERE NOT EXISTS (SELECT 1 FROM deployments dep WHERE dep.driver_id = d.driver_id);
-        """
-    )
-    total = cur.fetchone()["c"]
-    cur.execute(
-        """
-        SELECT d.name
-        FROM drivers d
-        WHERE NOT EXISTS (SELECT 1 FROM deployments dep WHERE dep.driver_id = d.driver_id)
-        ORDER BY d.name;
-        """
-    )
+    # One anti-join scan; the count falls out of the returned list.
+    cur.execute(_SQL_UNASSIGNED_DRIVER_NAMES)
     names = [r["name"] for r in cur.fetchall()]
-    conn.close()
-    return "All drivers are currently assigned." if not names else f"Unassigned drivers ({total}): " + ", ".join(names)
+    return "All drivers are currently assigned." if not names else f"Unassigned drivers ({len(names)}): " + ", ".join(names)
 
 
 def get_trip_status(trip_display_name: str) -> str:
-    conn = get_connection()
+    with _cache_lock:
+        cached = _cache["trip_status"].get(trip_display_name)
+        if cached is not None:
+            return cached
+        version = _cache["version"]
+    conn = get_ro_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT
-            t.display_name,
-            t.booking_status_percentage,
-            t.live_status,
-            r.route_display_name,
-            v.license_plate,
-            d.name AS driver_name
-        FROM daily_trips t
-        JOIN routes r ON r.route_id = t.route_id
-        LEFT JOIN deployments dep ON dep.trip_id = t.trip_id
-        LEFT JOIN vehicles v ON v.vehicle_id = dep.vehicle_id
-        LEFT JOIN drivers d ON d.driver_id = dep.driver_id
-        WHERE t.display_name = ?;
-        """,
-        (trip_display_name,),
-    )
+    cur.execute(_SQL_TRIP_STATUS, (trip_display_name,))
     row = cur.fetchone()
-    conn.close()
     if not row:
         return f"Trip '{trip_display_name}' not found."
 
@@ -414,57 +568,41 @@ def get_trip_status(trip_display_name: str) -> str:
         f"Vehicle {row['license_plate']} with driver {row['driver_name']}"
         if row["license_plate"] else "No vehicle/driver assigned"
     )
-    return (
+    status = (
         f"Trip '{row['display_name']}' is on route '{row['route_display_name']}', "
         f"booking status ~{row['booking_status_percentage']}%, "
         f"live status '{row['live_status']}'. {assigned}."
     )
+    with _cache_lock:
+        # Same late-store guard as the dashboard cache.
+        if _cache["version"] == version:
+            _cache["trip_status"][trip_display_name] = status
+    return status
 
 
 def list_stops_for_path(path_name: str) -> str:
-    conn = get_connection()
+    conn = get_ro_connection()
     cur = conn.cursor()
     cur.execute("SELECT path_id FROM paths WHERE path_name = ?;", (path_name,))
     p = cur.fetchone()
     if not p:
-        conn.close()
         return f"Path '{path_name}' not found."
 
-    cur.execute(
-        """
-        SELECT s.name
-        FROM path_stops ps
-        JOIN stops s ON s.stop_id = ps.stop_id
-        WHERE ps.path_id = ?
-        ORDER BY ps.seq ASC;
-        """,
-        (p["path_id"],),
-    )
+    cur.execute(_SQL_PATH_STOP_NAMES, (p["path_id"],))
     stops = [r["name"] for r in cur.fetchall()]
-    conn.close()
     return f"Path '{path_name}' has no stops configured." if not stops else f"Stops on {path_name}: " + " → ".join(stops)
 
 
 def list_routes_for_path(path_name: str) -> str:
-    conn = get_connection()
+    conn = get_ro_connection()
     cur = conn.cursor()
     cur.execute("SELECT path_id FROM paths WHERE path_name = ?;", (path_name,))
     p = cur.fetchone()
     if not p:
-        conn.close()
         return f"Path '{path_name}' not found."
 
-    cur.execute(
-        """
-        SELECT route_display_name, shift_time, direction, status
-        FROM routes
-        WHERE path_id = ?
-        ORDER BY shift_time;
-        """,
-        (p["path_id"],),
-    )
+    cur.execute(_SQL_ROUTES_FOR_PATH, (p["path_id"],))
     rows = cur.fetchall()
-    conn.close()
     if not rows:
         return f"No routes use path '{path_name}'."
     lines = [f"- {r['route_display_name']} ({r['direction']} @ {r['shift_time']}, {r['status']})" for r in rows]
@@ -472,18 +610,10 @@ def list_routes_for_path(path_name: str) -> str:
 
 
 def list_active_routes() -> str:
-    conn = get_connection()
+    conn = get_ro_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT route_display_name, shift_time, direction
-        FROM routes
-        WHERE status = 'active'
-        ORDER BY shift_time;
-        """
-    )
+    cur.execute(_SQL_ACTIVE_ROUTES)
     rows = cur.fetchall()
-    conn.close()
     return "There are no active routes." if not rows else "Active routes:\n" + "\n".join(
         f"- {r['route_display_name']} ({r['direction']} @ {r['shift_time']})" for r in rows
     )
@@ -493,17 +623,18 @@ def create_stop(name: str, latitude: Optional[float] = None, longitude: Optional
     """Create a new stop if not exists."""
     conn = get_connection()
     cur = conn.cursor()
-    try:
-        cur.execute(
-            "INSERT INTO stops (name, latitude, longitude) VALUES (?, ?, ?);",
-            (name, latitude, longitude),
-        )
-        conn.commit()
-        return f"Created new stop '{name}'."
-    except sqlite3.IntegrityError:
+    # ON CONFLICT DO NOTHING turns the duplicate case into a rowcount of 0
+    # instead of raising (and unwinding) an IntegrityError.
+    cur.execute(
+        "INSERT INTO stops (name, latitude, longitude) VALUES (?, ?, ?) "
+        "ON CONFLICT(name) DO NOTHING;",
+        (name, latitude, longitude),
+    )
+    if cur.rowcount == 0:
         return f"Stop '{name}' already exists."
-    finally:
-        conn.close()
+    conn.commit()
+    _invalidate_cache()
+    return f"Created new stop '{name}'."
 
 
 def create_path(path_name: str, stop_names: List[str]) -> str:
@@ -515,32 +646,50 @@ def create_path(path_name: str, stop_names: List[str]) -> str:
         return "Need at least one stop to create a path."
     conn = get_connection()
     cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE;")
     try:
-        cur.execute("INSERT INTO paths (path_name) VALUES (?);", (path_name,))
+        cur.execute(
+            "INSERT INTO paths (path_name) VALUES (?) ON CONFLICT(path_name) DO NOTHING;",
+            (path_name,),
+        )
+        if cur.rowcount == 0:
+            conn.rollback()
+            return f"Path '{path_name}' already exists."
         path_id = cur.lastrowid
 
-        for seq, s_name in enumerate(stop_names, start=1):
-            cur.execute("SELECT stop_id FROM stops WHERE name = ?;", (s_name,))
-            row = cur.fetchone()
-            if not row:
-                cur.execute(
-                    "INSERT INTO stops (name, latitude, longitude) VALUES (?, NULL, NULL);",
-                    (s_name,),
-                )
-                stop_id = cur.lastrowid
-            else:
-                stop_id = row["stop_id"]
-            cur.execute(
-                "INSERT INTO path_stops (path_id, stop_id, seq) VALUES (?, ?, ?);",
-                (path_id, stop_id, seq),
-            )
+        # One IN-select for existing stops; missing ones are inserted with
+        # RETURNING so their fresh ids come back from the insert itself
+        # instead of a second IN-select.
+        placeholders = ",".join("?" * len(stop_names))
+        cur.execute(
+            f"SELECT stop_id, name FROM stops WHERE name IN ({placeholders});",
+            stop_names,
+        )
+        stop_ids = {r["name"]: r["stop_id"] for r in cur.fetchall()}
+
+        for n in stop_names:
+            if n not in stop_ids:
+                row = cur.execute(
+                    "INSERT INTO stops (name, latitude, longitude) "
+                    "VALUES (?, NULL, NULL) RETURNING stop_id;",
+                    (n,),
+                ).fetchone()
+                stop_ids[n] = row["stop_id"]
+
+        cur.executemany(
+            "INSERT INTO path_stops (path_id, stop_id, seq) VALUES (?, ?, ?);",
+            [(path_id, stop_ids[n], seq) for seq, n in enumerate(stop_names, start=1)],
+        )
 
         conn.commit()
-        return f"Created path '{path_name}' with stops: " + " → ".join(stop_names)
-    except sqlite3.IntegrityError:
-        return f"Path '{path_name}' already exists."
-    finally:
-        conn.close()
+    except Exception:
+        # The connection is shared per thread: an open transaction left
+        # behind here would break the next BEGIN and let an unrelated
+        # commit flush the half-done path.
+        conn.rollback()
+        raise
+    _invalidate_cache()
+    return f"Created path '{path_name}' with stops: " + " → ".join(stop_names)
 
 
 def create_route(path_name: str, shift_time: str, direction: str) -> str:
@@ -550,47 +699,45 @@ def create_route(path_name: str, shift_time: str, direction: str) -> str:
     cur.execute("SELECT path_id FROM paths WHERE path_name = ?;", (path_name,))
     p = cur.fetchone()
     if not p:
-        conn.close()
         return f"Path '{path_name}' not found, cannot create route."
 
     path_id = p["path_id"]
 
     # derive start/end from first/last stop in path
-    cur.execute(
-        """
-        SELECT s.name
-        FROM path_stops ps
-        JOIN stops s ON s.stop_id = ps.stop_id
-        WHERE ps.path_id = ?
-        ORDER BY ps.seq ASC;
-        """,
-        (path_id,),
-    )
+    cur.execute(_SQL_PATH_STOP_NAMES, (path_id,))
     names = [r["name"] for r in cur.fetchall()]
     if not names:
-        conn.close()
         return f"Path '{path_name}' has no stops configured, cannot create route."
 
     start_point, end_point = names[0], names[-1]
     route_display_name = f"{path_name} - {shift_time}"
 
-    try:
-        cur.execute(
-            """
-            INSERT INTO routes (
-                path_id, route_display_name, shift_time, direction,
-                start_point, end_point, status
-            )
-            VALUES (?, ?, ?, ?, ?, ?, 'active');
-            """,
-            (path_id, route_display_name, shift_time, direction, start_point, end_point),
+    cur.execute(
+        """
+        INSERT INTO routes (
+            path_id, route_display_name, shift_time, direction,
+            start_point, end_point, status
         )
-        conn.commit()
-        return f"Created route '{route_display_name}' ({direction}) from {start_point} to {end_point}."
-    except sqlite3.IntegrityError:
+        VALUES (?, ?, ?, ?, ?, ?, 'active')
+        ON CONFLICT(route_display_name) DO NOTHING;
+        """,
+        (path_id, route_display_name, shift_time, direction, start_point, end_point),
+    )
+    if cur.rowcount == 0:
         return f"Route '{route_display_name}' already exists."
-    finally:
-        conn.close()
+    conn.commit()
+    _invalidate_cache()
+    return f"Created route '{route_display_name}' ({direction}) from {start_point} to {end_point}."
+
+
+_SQL_ASSIGN_LOOKUP = """
+    SELECT t.trip_id, v.vehicle_id, d.driver_id, dep.deployment_id
+    FROM (SELECT ? AS tn, ? AS vp, ? AS dn) p
+    LEFT JOIN daily_trips t ON t.display_name = p.tn
+    LEFT JOIN vehicles v ON v.license_plate = p.vp
+    LEFT JOIN drivers d ON d.name = p.dn
+    LEFT JOIN deployments dep ON dep.trip_id = t.trip_id;
+"""
 
 
 def assign_vehicle_and_driver(trip_display_name: str, vehicle_plate: str, driver_name: str) -> str:
@@ -598,41 +745,37 @@ def assign_vehicle_and_driver(trip_display_name: str, vehicle_plate: str, driver
     conn = get_connection()
     cur = conn.cursor()
 
-    cur.execute("SELECT trip_id FROM daily_trips WHERE display_name = ?;", (trip_display_name,))
-    trip = cur.fetchone()
-    if not trip:
-        conn.close()
+    # One round-trip resolves all three names plus the existing deployment:
+    # the LEFT JOINs turn "not found" into NULL columns instead of four
+    # serial point queries.
+    cur.execute(_SQL_ASSIGN_LOOKUP, (trip_display_name, vehicle_plate, driver_name))
+    row = cur.fetchone()
+    if row["trip_id"] is None:
         return f"Trip '{trip_display_name}' not found."
-
-    cur.execute("SELECT vehicle_id FROM vehicles WHERE license_plate = ?;", (vehicle_plate,))
-    vehicle = cur.fetchone()
-    if not vehicle:
-        conn.close()
+    if row["vehicle_id"] is None:
         return f"Vehicle '{vehicle_plate}' not found."
-
-    cur.execute("SELECT driver_id FROM drivers WHERE name = ?;", (driver_name,))
-    driver = cur.fetchone()
-    if not driver:
-        conn.close()
+    if row["driver_id"] is None:
         return f"Driver '{driver_name}' not found."
 
-    cur.execute("SELECT deployment_id FROM deployments WHERE trip_id = ?;", (trip["trip_id"],))
-    existing = cur.fetchone()
-    if existing:
-        cur.execute(
-            "UPDATE deployments SET vehicle_id = ?, driver_id = ? WHERE deployment_id = ?;",
-            (vehicle["vehicle_id"], driver["driver_id"], existing["deployment_id"]),
-        )
+    # The UNIQUE(trip_id) constraint lets one UPSERT cover both the fresh
+    # assignment and the reassignment case; the lookup row only decides
+    # the message wording.
+    cur.execute(
+        """
+        INSERT INTO deployments (trip_id, vehicle_id, driver_id) VALUES (?, ?, ?)
+        ON CONFLICT(trip_id) DO UPDATE SET
+            vehicle_id = excluded.vehicle_id,
+            driver_id = excluded.driver_id;
+        """,
+        (row["trip_id"], row["vehicle_id"], row["driver_id"]),
+    )
+    if row["deployment_id"] is not None:
         msg = f"Updated deployment: trip '{trip_display_name}' now uses vehicle {vehicle_plate} with driver {driver_name}."
     else:
-        cur.execute(
-            "INSERT INTO deployments (trip_id, vehicle_id, driver_id) VALUES (?, ?, ?);",
-            (trip["trip_id"], vehicle["vehicle_id"], driver["driver_id"]),
-        )
         msg = f"Assigned vehicle {vehicle_plate} and driver {driver_name} to trip '{trip_display_name}'."
 
     conn.commit()
-    conn.close()
+    _invalidate_cache()
     return msg
 
 
@@ -656,7 +799,6 @@ def remove_vehicle_from_trip(trip_display_name: str, force: bool = False) -> str
     )
     trip = cur.fetchone()
     if not trip:
-        conn.close()
         return f"Trip '{trip_display_name}' not found."
 
     cur.execute(
@@ -671,12 +813,10 @@ def remove_vehicle_from_trip(trip_display_name: str, force: bool = False) -> str
     )
     dep = cur.fetchone()
     if not dep:
-        conn.close()
         return f"No vehicle is currently assigned to trip '{trip_display_name}'."
 
     booking = trip["booking_status_percentage"] or 0.0
     if booking > 0 and not force:
-        conn.close()
         return (
             "WARNING: "
             f"Trip '{trip['display_name']}' on route '{trip['route_display_name']}' is already ~{booking}% booked. "
@@ -687,11 +827,32 @@ def remove_vehicle_from_trip(trip_display_name: str, force: bool = False) -> str
     # Actually remove
     cur.execute("DELETE FROM deployments WHERE deployment_id = ?;", (dep["deployment_id"],))
     conn.commit()
-    conn.close()
+    _invalidate_cache()
     return f"Removed vehicle '{dep['license_plate']}' and driver '{dep['driver_name']}' from trip '{trip_display_name}'."
 
 
 
+# Statement classes the agent must never run, enforced by SQLite itself
+# while it prepares the statement (comment/case/whitespace tricks that fool
+# substring checks never reach execution).
+_DENIED_SQL_ACTIONS = frozenset(
+    {
+        sqlite3.SQLITE_DROP_TABLE,
+        sqlite3.SQLITE_DROP_INDEX,
+        sqlite3.SQLITE_DROP_TRIGGER,
+        sqlite3.SQLITE_DROP_VIEW,
+        sqlite3.SQLITE_ALTER_TABLE,
+        sqlite3.SQLITE_PRAGMA,
+        sqlite3.SQLITE_ATTACH,
+        sqlite3.SQLITE_DETACH,
+    }
+)
+
+
+def _sql_authorizer(action: int, *_rest) -> int:
+    return sqlite3.SQLITE_DENY if action in _DENIED_SQL_ACTIONS else sqlite3.SQLITE_OK
+
+
 def dynamic_run_sql_query(query: str, mode: Literal["read", "write"] = "read") -> str:
     """
     Run a direct SQL query against the movi.db database.
@@ -704,40 +865,43 @@ def dynamic_run_sql_query(query: str, mode: Literal["read", "write"] = "read") -
         str: Result table or status message.
 
     Safety:
-        - 'read' mode only allows SELECT queries.
+        - 'read' mode opens the database read-only, so any write fails.
         - 'write' mode allows changes but commits explicitly.
-        - Any dangerous statements (DROP, ALTER, PRAGMA) are blocked.
+        - DROP/ALTER/PRAGMA/ATTACH/DETACH are denied by a connection
+          authorizer during statement preparation.
     """
-    q_lower = query.strip().lower()
-    banned = ("drop ", "alter ", "pragma", "attach", "detach")
-    if any(b in q_lower for b in banned):
-        return "Unsafe SQL command blocked."
-
-    if mode == "read" and not q_lower.startswith("select"):
-        return "Only SELECT queries allowed in read mode."
-
+    # The ro-URI connect below raises when the database file can't be
+    # opened, so conn must exist before the try for the finally to be safe.
+    conn = None
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        if mode == "read":
+            conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        else:
+            conn = sqlite3.connect(DB_PATH)
+        # Plain tuple rows: the formatter only stringifies positionally, so
+        # sqlite3.Row's name-lookup machinery is pure overhead here.
+        conn.set_authorizer(_sql_authorizer)
         cur = conn.cursor()
         cur.execute(query)
 
-        if q_lower.startswith("select"):
-            rows = cur.fetchall()
-            if not rows:
+        # cur.description is set for any row-returning statement (SELECT,
+        # WITH ... SELECT, RETURNING), not just ones spelled "SELECT ...".
+        if cur.description is not None:
+            # Stream rows straight off the cursor into one join instead of
+            # materializing a fetchall() list plus a parallel lines list.
+            header_line = " | ".join(c[0] for c in cur.description)
+            body = "\n".join(" | ".join(map(str, r)) for r in cur)
+            if not body:
                 return "Query executed. No rows returned."
-            headers = rows[0].keys()
-            lines = [" | ".join(headers)]
-            lines.append("-" * len(lines[0]))
-            for r in rows:
-                lines.append(" | ".join(str(x) for x in r))
-            return "\n".join(lines)
+            return f"{header_line}\n{'-' * len(header_line)}\n{body}"
         else:
             conn.commit()
+            _invalidate_cache()
             return f"Query executed successfully ({cur.rowcount} rows affected)."
     except Exception as e:
         return f"SQL error: {e}"
     finally:
-        conn.close()
+        if conn is not None:
+            conn.close()
 
 
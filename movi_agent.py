@@ -1,45 +1,113 @@
-from typing import Annotated, List, Dict, Any, Literal
+from typing import Annotated, List, Dict, Any, Literal, Optional
 from typing_extensions import TypedDict
+import asyncio
+import atexit
+import os
+import re
 import sqlite3
-
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+
+import httpx
+
+from langgraph.checkpoint.memory import MemorySaver
+try:
+    # Optional persistent checkpointer (langgraph-checkpoint-sqlite extra);
+    # falls back to in-memory threads when not installed.
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:
+    SqliteSaver = None
+try:
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+except ImportError:
+    aiosqlite = None
+    AsyncSqliteSaver = None
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode, tools_condition
+from langgraph.prebuilt import tools_condition
 
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import (
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.runnables import RunnableLambda
 from langchain_core.tools import StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, ConfigDict, Field
 
 import db
 
+# Conversation checkpoints live next to the main database file.
+_CHECKPOINT_DB_PATH = db.DB_PATH.parent / "movi_checkpoints.db"
+
 
 # ---- Graph state ----
 class MoviState(TypedDict):
     """Graph state for Movi agent."""
     messages: Annotated[list, add_messages]
     current_page: str
+    summary: str  # rolling digest of trimmed-away history (may be absent)
 
 
 # ---- Helper: schema extraction ----
+# The schema text is rebuilt only when PRAGMA schema_version moves, so the
+# steady-state cost per agent turn is one cheap PRAGMA instead of a fresh
+# connect + sqlite_master scan + string join.
+_SCHEMA_LOCK = threading.Lock()
+_SCHEMA_CACHE: Dict[str, Any] = {"version": None, "text": None}
+
+# group_concat assembles the whole schema string inside SQLite: one row
+# comes back instead of a Python loop allocating a fragment per table.
+# (No per-table header comment — the table name is in the CREATE statement
+# and the minifier strips comments anyway.)
+_SCHEMA_QUERY = """
+    SELECT group_concat(sql, char(10) || char(10))
+    FROM sqlite_master
+    WHERE type='table' AND name NOT LIKE 'sqlite_%';
+"""
+
+_DDL_LINE_COMMENT_RE = re.compile(r"--[^\n]*")
+_DDL_BLOCK_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_DDL_WS_RE = re.compile(r"\s+")
+
+
+def _minify_ddl(sql: str) -> str:
+    """Strip comments and collapse whitespace: prompt cost and latency both
+    scale with token count, and the indentation carries no signal."""
+    sql = _DDL_LINE_COMMENT_RE.sub("", sql)
+    sql = _DDL_BLOCK_COMMENT_RE.sub("", sql)
+    return _DDL_WS_RE.sub(" ", sql).strip()
+
+
 def _get_db_schema() -> str:
     """
     Introspect the SQLite database and return a readable schema definition.
     This allows the LLM to know actual tables and columns when writing SQL.
+
+    Memoized against PRAGMA schema_version; queries run on db's pooled
+    long-lived connection (WAL + tuned PRAGMAs already applied there).
     """
     try:
-        conn = sqlite3.connect(db.DB_PATH)
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT name, sql FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';"
-        )
-        schema_lines = []
-        for name, sql in cur.fetchall():
-            schema_lines.append(f"-- Table: {name}\n{sql.strip()}")
-        return "\n\n".join(schema_lines) if schema_lines else "(no tables found)"
+        with _SCHEMA_LOCK:
+            cur = db.get_connection().cursor()
+            version = cur.execute("PRAGMA schema_version;").fetchone()[0]
+            if version == _SCHEMA_CACHE["version"]:
+                return _SCHEMA_CACHE["text"]
+            raw = cur.execute(_SCHEMA_QUERY).fetchone()[0]
+            if raw:
+                text = "\n".join(_minify_ddl(ddl) for ddl in raw.split("\n\n"))
+            else:
+                text = "(no tables found)"
+            _SCHEMA_CACHE["version"] = version
+            _SCHEMA_CACHE["text"] = text
+            return text
     except Exception as e:
         return f"(error loading schema: {e})"
-    finally:
-        conn.close()
 
 
 # ---- Tool wrappers ----
@@ -98,54 +166,188 @@ def tool_list_unassigned_drivers() -> str:
     return db.list_unassigned_drivers()
 
 
+# Compiled once: a single alternation makes one pass over the query instead
+# of one substring scan per forbidden keyword. db's connection authorizer
+# remains the real enforcement; this just rejects the obvious cases before
+# a connection is even opened.
+_UNSAFE_SQL_RE = re.compile(r"\b(?:drop|alter|pragma|attach|detach)\b", re.IGNORECASE)
+
+
 def tool_run_dynamic_quries(query: str, mode: Literal["read", "write"] = "read") -> str:
     """
     Run dynamic SQL queries safely using db.dynamic_run_sql_query.
     Used as a fallback when no structured tool matches the user's intent.
     """
+    hit = _UNSAFE_SQL_RE.search(query)
+    if hit:
+        return f"SQL error: '{hit.group(0).upper()}' statements are not allowed."
     return db.dynamic_run_sql_query(query, mode)
 
 
+# Tools that never mutate state may run concurrently when the LLM emits
+# several calls in one message; everything else stays serial.
+for _fn in (
+    tool_count_unassigned_vehicles,
+    tool_get_trip_status,
+    tool_list_stops_for_path,
+    tool_list_routes_for_path,
+    tool_list_active_routes,
+    tool_list_unassigned_drivers,
+    tool_run_dynamic_quries,
+):
+    _fn._readonly = True
+
+
+# ---- Tool argument schemas ----
+# Pre-declared Pydantic models instead of StructuredTool.from_function, which
+# would re-derive each of these via signature + type-hint introspection.
+
+class _NoArgs(BaseModel):
+    pass
+
+
+class _TripArgs(BaseModel):
+    trip_display_name: str
+
+
+class _PathArgs(BaseModel):
+    path_name: str
+
+
+class _AssignArgs(BaseModel):
+    trip_display_name: str
+    vehicle_plate: str
+    driver_name: str
+
+
+class _RemoveVehicleArgs(BaseModel):
+    trip_display_name: str
+    force: bool = False
+
+
+class _CreateStopArgs(BaseModel):
+    name: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+class _CreatePathArgs(BaseModel):
+    # The stop list is re-checked by db.create_path anyway, so validation
+    # here is the minimal structural pass (no default/assignment re-runs),
+    # with a size cap so a runaway LLM payload fails fast.
+    model_config = ConfigDict(validate_default=False, validate_assignment=False)
+
+    path_name: str
+    stop_names: List[str] = Field(..., max_length=128)
+
+
+class _CreateRouteArgs(BaseModel):
+    path_name: str
+    shift_time: str
+    direction: str
+
+
+class _DynamicQueryArgs(BaseModel):
+    query: str
+    mode: Literal["read", "write"] = "read"
+
+
+def _tool(fn, args_schema: type[BaseModel]) -> StructuredTool:
+    """Build a StructuredTool from a function and its pre-declared schema."""
+    return StructuredTool(
+        name=fn.__name__,
+        description=fn.__doc__,
+        func=fn,
+        args_schema=args_schema,
+    )
+
+
 # ---- Build tool list ----
 TOOLS = [
-    StructuredTool.from_function(tool_count_unassigned_vehicles),
-    StructuredTool.from_function(tool_get_trip_status),
-    StructuredTool.from_function(tool_list_stops_for_path),
-    StructuredTool.from_function(tool_list_routes_for_path),
-    StructuredTool.from_function(tool_assign_vehicle_and_driver),
-    StructuredTool.from_function(tool_remove_vehicle_from_trip),
-    StructuredTool.from_function(tool_create_stop),
-    StructuredTool.from_function(tool_create_path),
-    StructuredTool.from_function(tool_create_route),
-    StructuredTool.from_function(tool_list_active_routes),
-    StructuredTool.from_function(tool_list_unassigned_drivers),
-    StructuredTool.from_function(tool_run_dynamic_quries),
+    _tool(tool_count_unassigned_vehicles, _NoArgs),
+    _tool(tool_get_trip_status, _TripArgs),
+    _tool(tool_list_stops_for_path, _PathArgs),
+    _tool(tool_list_routes_for_path, _PathArgs),
+    _tool(tool_assign_vehicle_and_driver, _AssignArgs),
+    _tool(tool_remove_vehicle_from_trip, _RemoveVehicleArgs),
+    _tool(tool_create_stop, _CreateStopArgs),
+    _tool(tool_create_path, _CreatePathArgs),
+    _tool(tool_create_route, _CreateRouteArgs),
+    _tool(tool_list_active_routes, _NoArgs),
+    _tool(tool_list_unassigned_drivers, _NoArgs),
+    _tool(tool_run_dynamic_quries, _DynamicQueryArgs),
 ]
 
 
 # ---- LLM setup ----
-LLM = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
-
+# Shared HTTP/2 clients (sync for invoke/stream, async for ainvoke):
+# multiplexing plus keepalives skip the TCP/TLS handshake on every LLM
+# round-trip, same as the clients in audio_utils.
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+_HTTP = httpx.Client(http2=True, timeout=30, limits=_HTTP_LIMITS)
+_AHTTP = httpx.AsyncClient(http2=True, timeout=30, limits=_HTTP_LIMITS)
 
-# ---- System prompt builder ----
-def _build_system_prompt(current_page: str) -> str:
-    """
-    Builds Movi's system prompt, injecting the live DB schema.
-    """
-    schema_text = _get_db_schema()
 
-    return f"""
-You are Movi, the transport manager assistant for MoveInSync Shuttle.
+@atexit.register
+def _close_http_clients() -> None:
+    try:
+        _HTTP.close()
+    except Exception:
+        pass
+    try:
+        asyncio.run(_AHTTP.aclose())
+    except Exception:
+        pass
+
+
+LLM = ChatOpenAI(
+    model="gpt-4o-mini",
+    temperature=0.1,
+    http_client=_HTTP,
+    http_async_client=_AHTTP,
+)
+
+# Serialized once: the OpenAI function specs are a pure function of TOOLS,
+# so bind() gets the finished JSON instead of bind_tools re-deriving each
+# tool's Pydantic schema. TOOLS itself stays around in runnable form for
+# the tools node.
+_OPENAI_TOOLS_JSON = [convert_to_openai_tool(t) for t in TOOLS]
+_LLM_WITH_TOOLS = LLM.bind(tools=_OPENAI_TOOLS_JSON)
+
+# Cheaper model for plain lookup turns, bound with the same tool specs so
+# either model can drive the tools node.
+_LLM_CHEAP = ChatOpenAI(
+    model=os.getenv("MOVI_CHEAP_MODEL", "gpt-4.1-nano"),
+    temperature=0.1,
+    http_client=_HTTP,
+    http_async_client=_AHTTP,
+)
+_LLM_CHEAP_WITH_TOOLS = _LLM_CHEAP.bind(tools=_OPENAI_TOOLS_JSON)
+
+# Short messages matching these lookup verbs map directly onto the
+# structured read tools; anything longer or murkier keeps the full model.
+_SIMPLE_INTENT_RE = re.compile(
+    r"\b(?:count|how many|list|show|status|stops?|routes?|paths?|unassigned|active)\b",
+    re.IGNORECASE,
+)
+
+
+def _pick_llm(messages: list):
+    """Route simple lookup turns to the cheaper bound model."""
+    last_user = next(
+        (m for m in reversed(messages) if getattr(m, "type", "") == "human"), None
+    )
+    text = last_user.content if last_user and isinstance(last_user.content, str) else ""
+    if text and len(text) <= 120 and _SIMPLE_INTENT_RE.search(text):
+        return _LLM_CHEAP_WITH_TOOLS
+    return _LLM_WITH_TOOLS
 
-You manage a SQLite database with this schema:
-{schema_text}
 
-You know the relationships:
-- Stops → Paths (ordered stops) → Routes (Path + time + direction + status)
-- Routes → DailyTrips (per-day trip instances)
-- DailyTrips → Deployments (vehicle + driver assigned)
-
-Current UI Page: {current_page}
+# ---- System prompt builder ----
+# The prompt only varies in the current page name, so the schema-bearing
+# bulk of it is pre-rendered once and per-call assembly is a single concat.
+_PROMPT_PREFIX = ""
+_PROMPT_SUFFIX = """
 
 GENERAL BEHAVIOUR
 - Speak like a helpful backend engineer.
@@ -165,37 +367,325 @@ TRIBAL KNOWLEDGE
 
 Be concise, factual, and data-grounded.
 """
+_PROMPT_SCHEMA_VERSION: Any = None
+
+_PREFIX_TEMPLATE = Template("""
+You are Movi, the transport manager assistant for MoveInSync Shuttle.
+
+You manage a SQLite database with this schema:
+$schema_text
+
+You know the relationships:
+- Stops → Paths (ordered stops) → Routes (Path + time + direction + status)
+- Routes → DailyTrips (per-day trip instances)
+- DailyTrips → Deployments (vehicle + driver assigned)
+
+Current UI Page: """)
+
+
+class _LazySchema(dict):
+    """Mapping that materializes the schema text only if substitution asks."""
+
+    def __missing__(self, key: str) -> str:
+        if key == "schema_text":
+            text = _get_db_schema()
+            self[key] = text
+            return text
+        raise KeyError(key)
+
+
+def _refresh_prompt_template() -> None:
+    """Re-render the prompt prefix if the DB schema has changed.
+
+    Nothing runs at import, so a process that never reaches an agent turn
+    (or imports this module before init_db) never touches the database.
+    """
+    global _PROMPT_PREFIX, _PROMPT_SCHEMA_VERSION
+    _get_db_schema()  # revalidate the memo: one PRAGMA in the common case
+    version = _SCHEMA_CACHE["version"]
+    if _PROMPT_PREFIX and version == _PROMPT_SCHEMA_VERSION:
+        return
+    _PROMPT_PREFIX = _PREFIX_TEMPLATE.substitute(_LazySchema())
+    _PROMPT_SCHEMA_VERSION = version
+
+
+def _build_system_prompt(current_page: str) -> str:
+    """
+    Builds Movi's system prompt, injecting the live DB schema.
+    """
+    # The refresh is a memoized schema_version check in the common case.
+    _refresh_prompt_template()
+    return _PROMPT_PREFIX + current_page + _PROMPT_SUFFIX
+
+
+# Interned SystemMessage per page: the content is a pure function of
+# (page, schema version), so the same immutable message object is reused
+# across turns instead of re-running Pydantic construction each time.
+_SYS_MSGS: Dict[str, SystemMessage] = {}
+_SYS_MSGS_VERSION: Any = None
+
+
+def _get_sys_msg(current_page: str) -> SystemMessage:
+    """Return the shared SystemMessage for a page, rebuilt on schema change."""
+    global _SYS_MSGS_VERSION
+    _refresh_prompt_template()
+    if _SYS_MSGS_VERSION != _PROMPT_SCHEMA_VERSION:
+        _SYS_MSGS.clear()
+        _SYS_MSGS_VERSION = _PROMPT_SCHEMA_VERSION
+    msg = _SYS_MSGS.get(current_page)
+    if msg is None:
+        msg = SystemMessage(content=_PROMPT_PREFIX + current_page + _PROMPT_SUFFIX)
+        _SYS_MSGS[current_page] = msg
+    return msg
 
 
 # ---- Graph nodes ----
+def _agent_inputs(state: MoviState) -> list:
+    """System message (plus history digest, when present) ahead of the live window."""
+    msgs = [_get_sys_msg(state.get("current_page", "unknown"))]
+    summary = state.get("summary")
+    if summary:
+        msgs.append(
+            SystemMessage(content="Summary of the earlier conversation: " + summary)
+        )
+    return msgs + state["messages"]
+
+
 def _agent_node(state: MoviState) -> Dict[str, Any]:
     """Main LLM node that decides which tool(s) to call."""
-    sys_msg = SystemMessage(content=_build_system_prompt(state.get("current_page", "unknown")))
-    llm_with_tools = LLM.bind_tools(TOOLS)
-    result = llm_with_tools.invoke([sys_msg] + state["messages"])
+    inputs = _agent_inputs(state)
+    llm = _pick_llm(state["messages"])
+    try:
+        result = llm.invoke(inputs)
+    except Exception:
+        if llm is _LLM_WITH_TOOLS:
+            raise
+        # Cheap-model failure falls back to the full model.
+        result = _LLM_WITH_TOOLS.invoke(inputs)
+    return {"messages": [result]}
+
+
+async def _accumulate_stream(llm, messages):
+    """Stream the completion, merging chunks into one final message."""
+    accumulated = None
+    async for chunk in llm.astream(messages):
+        accumulated = chunk if accumulated is None else accumulated + chunk
+    return accumulated
+
+
+async def _agent_node_async(state: MoviState) -> Dict[str, Any]:
+    """Async twin of _agent_node: frees the event loop during the HTTP call,
+    so concurrent sessions run through one loop instead of one thread each.
+
+    The completion is consumed as a token stream — LangGraph forwards the
+    chunks to stream_mode="messages" consumers as they arrive, so first
+    tokens (and tool-call deltas) reach the UI before the model finishes —
+    while the merged message is what enters graph state.
+    """
+    inputs = _agent_inputs(state)
+    llm = _pick_llm(state["messages"])
+    try:
+        result = await _accumulate_stream(llm, inputs)
+    except Exception:
+        if llm is _LLM_WITH_TOOLS:
+            raise
+        result = await _accumulate_stream(_LLM_WITH_TOOLS, inputs)
     return {"messages": [result]}
 
 
+# One bounded pool for all tool dispatch: burst load otherwise fans out on
+# unbounded ad-hoc threads, which just pile up behind SQLite's one-writer
+# lock. Eight readers is plenty for this workload.
+_TOOL_POOL = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 8), thread_name_prefix="movi-tool"
+)
+atexit.register(_TOOL_POOL.shutdown, wait=False)
+
+
+class FastToolNode:
+    """Tools node with O(1) dict dispatch on the tool-call name.
+
+    The tool calls come from our own pre-serialized specs, so the args dict
+    maps straight onto the wrapped functions — no linear scan over TOOLS and
+    none of ToolNode's generic input coercion. Multi-call turns made purely
+    of read-only tools fan out concurrently (WAL-mode SQLite serves parallel
+    readers, so wall-clock is the slowest call instead of the sum); any
+    batch containing a write runs serially in order.
+    """
+
+    def __init__(self, tools: List[StructuredTool]):
+        self._by_name = {t.name: t for t in tools}
+
+    def _run_call(self, call: Dict[str, Any]) -> ToolMessage:
+        tool = self._by_name.get(call["name"])
+        if tool is None:
+            content = f"Error: unknown tool '{call['name']}'."
+        else:
+            try:
+                # Run the args through the tool's schema before dispatch;
+                # calling func directly would skip the pydantic coercion
+                # and caps the schemas exist to enforce.
+                args = call["args"]
+                if tool.args_schema is not None:
+                    args = tool.args_schema.model_validate(args).model_dump()
+                content = tool.func(**args)
+            except Exception as e:
+                content = f"Error: {e!r}"
+        return ToolMessage(content=str(content), name=call["name"], tool_call_id=call["id"])
+
+    def _fans_out(self, calls: List[Dict[str, Any]]) -> bool:
+        return len(calls) > 1 and all(
+            call["name"] in self._by_name
+            and getattr(self._by_name[call["name"]].func, "_readonly", False)
+            for call in calls
+        )
+
+    def __call__(self, state: MoviState) -> Dict[str, Any]:
+        calls = state["messages"][-1].tool_calls
+        if not self._fans_out(calls):
+            return {"messages": [self._run_call(c) for c in calls]}
+        return {"messages": list(_TOOL_POOL.map(self._run_call, calls))}
+
+    async def acall(self, state: MoviState) -> Dict[str, Any]:
+        calls = state["messages"][-1].tool_calls
+        loop = asyncio.get_running_loop()
+        if not self._fans_out(calls):
+            return {
+                "messages": [
+                    await loop.run_in_executor(_TOOL_POOL, self._run_call, c)
+                    for c in calls
+                ]
+            }
+        messages = await asyncio.gather(
+            *[loop.run_in_executor(_TOOL_POOL, self._run_call, call) for call in calls]
+        )
+        return {"messages": list(messages)}
+
+
+_TOOLS_NODE = FastToolNode(TOOLS)
+
+
+# Once the checkpointed thread grows past this, old turns are folded into a
+# rolling summary so prompt size scales with the window, not turn count.
+_HISTORY_LIMIT = 20
+_HISTORY_KEEP = 5
+
+
+def _summarize_node(state: MoviState) -> Dict[str, Any]:
+    """Fold everything but the last few messages into one rolling summary."""
+    messages = state["messages"]
+    keep_start = len(messages) - _HISTORY_KEEP
+    # Never cut between an AI tool call and its ToolMessage results.
+    while keep_start < len(messages) and isinstance(messages[keep_start], ToolMessage):
+        keep_start += 1
+    old = messages[:keep_start]
+    if not old:
+        return {}
+    prior = state.get("summary")
+    lead = (
+        [SystemMessage(content="Summary of the conversation so far: " + prior)]
+        if prior
+        else []
+    )
+    result = _LLM_CHEAP.invoke(
+        lead
+        + old
+        + [
+            HumanMessage(
+                content="Summarize the conversation above in a few sentences, "
+                "keeping trip, route, vehicle and driver names exact."
+            )
+        ]
+    )
+    return {
+        "summary": result.content,
+        "messages": [RemoveMessage(id=m.id) for m in old],
+    }
+
+
+def _needs_summary(state: MoviState) -> str:
+    return "summarize" if len(state["messages"]) > _HISTORY_LIMIT else "agent"
+
+
 # ---- Build LangGraph ----
-def build_movi_graph():
-    """Construct and compile Movi's LangGraph."""
-    builder = StateGraph(MoviState)
-    builder.add_node("agent", _agent_node)
-    builder.add_node("tools", ToolNode(TOOLS))
+def build_movi_graph(checkpointer=None):
+    """Construct and compile Movi's LangGraph.
 
-    builder.add_edge(START, "agent")
+    A checkpointer may be passed in; by default the graph is compiled
+    against the sync SQLite saver (or in-memory without the extra).
+    """
+    builder = StateGraph(MoviState)
+    # Both entry points registered: sync callers (stream/batch) keep the
+    # plain function, async execution awaits the LLM call directly.
+    builder.add_node("agent", RunnableLambda(_agent_node, afunc=_agent_node_async))
+    builder.add_node("tools", RunnableLambda(_TOOLS_NODE.__call__, afunc=_TOOLS_NODE.acall))
+    builder.add_node("summarize", _summarize_node)
+
+    # Long threads detour through the summarizer before hitting the agent.
+    builder.add_conditional_edges(
+        START, _needs_summary, {"summarize": "summarize", "agent": "agent"}
+    )
+    builder.add_edge("summarize", "agent")
     builder.add_conditional_edges("agent", tools_condition)
     builder.add_edge("tools", "agent")
     builder.add_edge("agent", END)
-    return builder.compile()
-
+    # Checkpointer keeps per-thread message state server-side, so callers
+    # only need to send the newest message instead of the whole history.
+    # The SQLite-backed saver persists threads across process restarts.
+    if checkpointer is None:
+        if SqliteSaver is not None:
+            checkpointer = SqliteSaver(
+                sqlite3.connect(_CHECKPOINT_DB_PATH, check_same_thread=False)
+            )
+        else:
+            checkpointer = MemorySaver()
+    return builder.compile(checkpointer=checkpointer)
+
+
+# ---- Global instance ----
+# Compiled eagerly at import: the build cost moves into process startup
+# instead of the first user request, and there is no lazy-init check (or
+# its race) left on the request path.
+MOVI_GRAPH = build_movi_graph()
+
+# Async variant built lazily: SqliteSaver only implements the sync
+# checkpoint interface, so ainvoke/astream against MOVI_GRAPH would raise
+# NotImplementedError at the first checkpoint access.
+_MOVI_GRAPH_ASYNC = None
+_ASYNC_GRAPH_LOCK = asyncio.Lock()
 
-# ---- Lazy global instance ----
-_MOVI_GRAPH = None
 
 def get_movi_graph():
-    """Return or initialize Movi's compiled LangGraph."""
-    global _MOVI_GRAPH
-    if _MOVI_GRAPH is None:
-        _MOVI_GRAPH = build_movi_graph()
-    return _MOVI_GRAPH
+    """Return Movi's compiled LangGraph."""
+    return MOVI_GRAPH
+
+
+async def _async_checkpointer():
+    """Build an async-capable saver, falling back to MemorySaver."""
+    if AsyncSqliteSaver is None:
+        return MemorySaver()
+    conn = None
+    try:
+        conn = await aiosqlite.connect(_CHECKPOINT_DB_PATH)
+        return AsyncSqliteSaver(conn)
+    except Exception:
+        # Don't leak the connection (and its runner thread) if the
+        # saver can't be built on top of it.
+        if conn is not None:
+            await conn.close()
+        return MemorySaver()
+
+
+async def aget_movi_graph():
+    """Return the graph variant for ainvoke/astream callers.
+
+    Built on first use from the running event loop: AsyncSqliteSaver
+    binds to the loop that constructs it, so it cannot be prepared
+    eagerly at import like MOVI_GRAPH.
+    """
+    global _MOVI_GRAPH_ASYNC
+    if _MOVI_GRAPH_ASYNC is None:
+        async with _ASYNC_GRAPH_LOCK:
+            if _MOVI_GRAPH_ASYNC is None:
+                _MOVI_GRAPH_ASYNC = build_movi_graph(await _async_checkpointer())
+    return _MOVI_GRAPH_ASYNC